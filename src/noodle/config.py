@@ -3,6 +3,7 @@ Configuration management for Noodle.
 
 Uses XDG base directories:
 - Config: ~/.config/noodle/config.toml
+- Cache: ~/.cache/noodle/
 - Data: ~/noodle/ (the brain itself)
 """
 
@@ -12,6 +13,7 @@ import os
 
 # XDG defaults
 DEFAULT_CONFIG_HOME = Path.home() / ".config"
+DEFAULT_CACHE_HOME = Path.home() / ".cache"
 DEFAULT_DATA_HOME = Path.home() / "noodle"
 
 
@@ -21,6 +23,12 @@ def get_config_dir() -> Path:
     return base / "noodle"
 
 
+def get_cache_dir() -> Path:
+    """Get the cache directory (XDG_CACHE_HOME/noodle)."""
+    base = Path(os.environ.get("XDG_CACHE_HOME", DEFAULT_CACHE_HOME))
+    return base / "noodle"
+
+
 def get_noodle_home() -> Path:
     """Get the noodle data directory (~/noodle or NOODLE_HOME)."""
     if env_home := os.environ.get("NOODLE_HOME"):
@@ -13,7 +13,7 @@ from typing import Any, Iterator
 from noodle.config import get_db_path, get_noodle_home
 
 # Schema version for migrations
-SCHEMA_VERSION = 3
+SCHEMA_VERSION = 6
 
 SCHEMA = """
 -- Schema version tracking
@@ -109,9 +109,19 @@ CREATE INDEX IF NOT EXISTS idx_entries_type ON entries(type);
 CREATE INDEX IF NOT EXISTS idx_entries_project ON entries(project_id);
 CREATE INDEX IF NOT EXISTS idx_entries_due_date ON entries(due_date);
 CREATE INDEX IF NOT EXISTS idx_entries_created ON entries(created_at);
-CREATE INDEX IF NOT EXISTS idx_entries_needs_reclass ON entries(needs_reclassification);
 CREATE INDEX IF NOT EXISTS idx_entries_archived ON entries(archived_at);
 CREATE INDEX IF NOT EXISTS idx_entries_seq ON entries(seq);
+CREATE INDEX IF NOT EXISTS idx_entries_updated ON entries(updated_at);
+
+-- Composite and partial indexes matching the digest query shapes
+CREATE INDEX IF NOT EXISTS idx_tasks_due
+    ON entries(type, completed_at, due_date, priority) WHERE type = 'task';
+CREATE INDEX IF NOT EXISTS idx_events_due
+    ON entries(type, due_date) WHERE type = 'event';
+CREATE INDEX IF NOT EXISTS idx_entries_type_created
+    ON entries(type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_entries_reclass
+    ON entries(needs_reclassification) WHERE needs_reclassification = 1;
 
 -- FTS triggers
 CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
@@ -129,6 +139,14 @@ END;
 """
 
 
+# Columns needed to render entry listings, returned as tuples in this order;
+# the title length is bound as a parameter
+BRIEF_COLUMNS = "e.id, e.seq, e.type, substr(e.title, 1, ?) AS title, e.due_date, e.completed_at"
+
+# Manual review queue size; answered from the idx_entries_reclass partial index
+REVIEW_QUEUE_COUNT_SQL = "SELECT COUNT(*) FROM entries WHERE needs_reclassification = 1"
+
+
 class Database:
     """SQLite database wrapper for Noodle."""
 
@@ -162,9 +180,9 @@ class Database:
             # Check current version
             try:
                 current = conn.execute(
-                    "SELECT version FROM schema_version"
+                    "SELECT MAX(version) FROM schema_version"
                 ).fetchone()
-                current_version = current[0] if current else 0
+                current_version = current[0] or 0
             except sqlite3.OperationalError:
                 current_version = 0
 
@@ -196,6 +214,38 @@ class Database:
                     # Create unique index separately
                     conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_seq_unique ON entries(seq)")
                     conn.commit()
+
+            # Migration: v3 -> v4: Add digest partial indexes and refresh planner stats
+            if current_version < 4:
+                conn.executescript("""
+                    CREATE INDEX IF NOT EXISTS idx_tasks_due
+                        ON entries(type, completed_at, due_date, priority) WHERE type = 'task';
+                    CREATE INDEX IF NOT EXISTS idx_thoughts_created
+                        ON entries(type, created_at) WHERE type = 'thought';
+                    CREATE INDEX IF NOT EXISTS idx_events_due
+                        ON entries(type, due_date) WHERE type = 'event';
+                    ANALYZE;
+                """)
+
+            # Migration: v4 -> v5: Newest-first index per type for thoughts and
+            # open tasks; shrink the review-queue index to flagged rows only
+            if current_version < 5:
+                conn.executescript("""
+                    DROP INDEX IF EXISTS idx_thoughts_created;
+                    DROP INDEX IF EXISTS idx_entries_needs_reclass;
+                    CREATE INDEX IF NOT EXISTS idx_entries_type_created
+                        ON entries(type, created_at DESC);
+                    CREATE INDEX IF NOT EXISTS idx_entries_reclass
+                        ON entries(needs_reclassification) WHERE needs_reclassification = 1;
+                    ANALYZE;
+                """)
+
+            # Migration: v5 -> v6: Index updated_at for the digest cache key
+            if current_version < 6:
+                conn.executescript("""
+                    CREATE INDEX IF NOT EXISTS idx_entries_updated ON entries(updated_at);
+                    ANALYZE;
+                """)
         finally:
             conn.close()
 
@@ -361,8 +411,39 @@ class Database:
         include_archived: bool = False,
     ) -> list[dict[str, Any]]:
         """Get entries with optional filters."""
-        query = "SELECT * FROM entries WHERE 1=1"
-        params: list[Any] = []
+        return self._query_entries(
+            "e.*", [], entry_type, project, limit, include_completed, include_archived
+        )
+
+    def get_entries_brief(
+        self,
+        entry_type: str | None = None,
+        project: str | None = None,
+        limit: int = 20,
+        include_completed: bool = False,
+        include_archived: bool = False,
+        title_length: int = 42,
+    ) -> list[tuple[Any, ...]]:
+        """Like get_entries, but BRIEF_COLUMNS tuples, with titles truncated in SQL."""
+        return self._query_entries(
+            BRIEF_COLUMNS, [title_length],
+            entry_type, project, limit, include_completed, include_archived,
+            row_type=tuple,
+        )
+
+    def _query_entries(
+        self,
+        columns: str,
+        params: list[Any],
+        entry_type: str | None,
+        project: str | None,
+        limit: int,
+        include_completed: bool,
+        include_archived: bool,
+        row_type: type = dict,
+    ) -> list[Any]:
+        """Run the filtered entries query selecting the given columns."""
+        query = f"SELECT {columns} FROM entries e WHERE 1=1"
 
         if entry_type:
             query += " AND type = ?"
@@ -382,20 +463,31 @@ class Database:
         params.append(limit)
 
         with self._connect() as conn:
-            rows = conn.execute(query, params).fetchall()
-            return [dict(row) for row in rows]
+            return [row_type(row) for row in conn.execute(query, params)]
 
     def search(self, query: str, limit: int = 20) -> list[dict[str, Any]]:
         """Full-text search across entries."""
+        return self._search("e.*", [], query, limit)
+
+    def search_brief(
+        self, query: str, limit: int = 20, title_length: int = 42
+    ) -> list[tuple[Any, ...]]:
+        """Like search, but BRIEF_COLUMNS tuples, with titles truncated in SQL."""
+        return self._search(BRIEF_COLUMNS, [title_length], query, limit, row_type=tuple)
+
+    def _search(
+        self, columns: str, params: list[Any], query: str, limit: int,
+        row_type: type = dict,
+    ) -> list[Any]:
+        """Run the full-text search selecting the given columns."""
         with self._connect() as conn:
-            rows = conn.execute("""
-                SELECT e.* FROM entries e
+            return [row_type(row) for row in conn.execute(f"""
+                SELECT {columns} FROM entries e
                 JOIN entries_fts fts ON e.rowid = fts.rowid
                 WHERE entries_fts MATCH ?
                 ORDER BY rank
                 LIMIT ?
-            """, (query, limit)).fetchall()
-            return [dict(row) for row in rows]
+            """, (*params, query, limit))]
 
     def complete_task(self, entry_id: str) -> bool:
         """Mark a task as complete. Returns True if successful."""
@@ -439,23 +531,20 @@ class Database:
     def get_pending_reclassification(self) -> list[dict[str, Any]]:
         """Get entries that need manual reclassification."""
         with self._connect() as conn:
-            rows = conn.execute("""
+            return [dict(row) for row in conn.execute("""
                 SELECT * FROM entries
                 WHERE needs_reclassification = 1
                 ORDER BY created_at DESC
-            """).fetchall()
-            return [dict(row) for row in rows]
+            """)]
 
     def get_stats(self) -> dict[str, Any]:
         """Get database statistics."""
         with self._connect() as conn:
             total = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
-            by_type = dict(conn.execute("""
+            by_type = {row[0]: row[1] for row in conn.execute("""
                 SELECT type, COUNT(*) FROM entries GROUP BY type
-            """).fetchall())
-            pending = conn.execute(
-                "SELECT COUNT(*) FROM entries WHERE needs_reclassification = 1"
-            ).fetchone()[0]
+            """)}
+            pending = conn.execute(REVIEW_QUEUE_COUNT_SQL).fetchone()[0]
 
             return {
                 "total_entries": total,
@@ -91,7 +91,7 @@ def check_telegram() -> tuple[str, str]:
     if not users:
         env_users = os.environ.get("NOODLE_TELEGRAM_USERS", "")
         if env_users:
-            users = [u.strip() for u in env_users.split(",") if u.strip()]
+            users = [u for u in map(str.strip, env_users.split(",")) if u]
 
     if not users:
         return "!", "No authorized users"
@@ -0,0 +1,109 @@
+"""
+Batched inbox writer for Noodle.
+
+Long-running ingress (the Telegram bot, the MCP server) funnels captures
+through one writer task per inbox. Whatever queues up while a write is in
+flight goes out together in the next one, paying one open/lock/fsync per
+batch instead of per capture. Batching needs concurrent producers: the bot
+handles updates concurrently for this, and each MCP tool call is its own task.
+"""
+
+import asyncio
+from pathlib import Path
+
+from noodle.ingress import append_lines_to_inbox, format_inbox_line, generate_id
+
+# One writer per inbox path, shared by every producer in the process
+_BATCHERS: dict[Path, "InboxBatcher"] = {}
+
+
+def get_inbox_batcher(inbox_path: Path) -> "InboxBatcher":
+    """Return the process-wide batcher for an inbox, creating it on first use."""
+    batcher = _BATCHERS.get(inbox_path)
+    if batcher is None:
+        batcher = _BATCHERS[inbox_path] = InboxBatcher(inbox_path)
+    return batcher
+
+
+class InboxBatcher:
+    """
+    Single writer for inbox.log fed by an asyncio queue.
+
+    capture() returns the entry ID only after its line is on disk, so an
+    acknowledged capture is as durable as append_to_inbox; if the write
+    fails, capture() raises the error instead. All methods must be called
+    from the same event loop.
+    """
+
+    def __init__(self, inbox_path: Path):
+        self.inbox_path = inbox_path
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future[None]] | None] = asyncio.Queue()
+        self._last_id = 0
+        self._task: asyncio.Task | None = None
+
+    async def capture(self, text: str, source: str = "cli") -> str:
+        """Queue a capture, wait for it to be written and return its entry ID."""
+        # Millisecond IDs collide within a burst; keep them strictly increasing
+        entry_id = max(int(generate_id()), self._last_id + 1)
+        self._last_id = entry_id
+
+        line = format_inbox_line(str(entry_id), text, source)
+        # Reject unencodable text (e.g. lone surrogates) here, so it fails
+        # only this caller instead of the whole batch it would be written in
+        line.encode("utf-8")
+
+        written = asyncio.get_running_loop().create_future()
+        self.start()
+        await self._queue.put((line, written))
+        await written
+        return str(entry_id)
+
+    def start(self) -> None:
+        """Start the writer task on the running loop if it isn't running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write everything already queued, then stop the writer task."""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            batch = []
+            stopping = item is None
+            if item is not None:
+                batch.append(item)
+
+            # Take everything that queued up meanwhile into the same write
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: list[tuple[str, asyncio.Future[None]]]) -> None:
+        # Off the loop thread, so producers keep queueing during the fsync.
+        # Any failure goes to the batch's callers; the writer task keeps running.
+        try:
+            await asyncio.to_thread(
+                append_lines_to_inbox, [line for line, _ in batch], self.inbox_path
+            )
+        except Exception as e:
+            for _, written in batch:
+                if not written.done():
+                    written.set_exception(e)
+        else:
+            for _, written in batch:
+                if not written.done():
+                    written.set_result(None)
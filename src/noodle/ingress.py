@@ -16,6 +16,29 @@ def generate_id() -> str:
     return str(int(time.time() * 1000))
 
 
+def format_inbox_line(entry_id: str, text: str, source: str) -> str:
+    """Format one inbox.log line, timestamped now."""
+    timestamp = datetime.now(timezone.utc).isoformat()
+
+    # Tab-separated: id, timestamp, source, text (newlines in text become \n literal)
+    escaped_text = text.replace("\n", "\\n").replace("\t", "\\t")
+    return f"{entry_id}\t{timestamp}\t{source}\t{escaped_text}\n"
+
+
+def append_lines_to_inbox(lines: list[str], inbox_path: Path) -> None:
+    """Append preformatted inbox lines in one locked write and a single fsync."""
+    # Ensure parent directory exists
+    inbox_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Atomic append with file locking
+    with open(inbox_path, "a", encoding="utf-8") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        f.write("".join(lines))
+        f.flush()
+        os.fsync(f.fileno())  # Ensure durability
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
 def append_to_inbox(text: str, inbox_path: Path, source: str = "cli") -> str:
     """
     Append raw text to inbox.log with timestamp.
@@ -34,23 +57,7 @@ def append_to_inbox(text: str, inbox_path: Path, source: str = "cli") -> str:
         The generated entry ID
     """
     entry_id = generate_id()
-    timestamp = datetime.now(timezone.utc).isoformat()
-
-    # Tab-separated: id, timestamp, source, text (newlines in text become \n literal)
-    escaped_text = text.replace("\n", "\\n").replace("\t", "\\t")
-    line = f"{entry_id}\t{timestamp}\t{source}\t{escaped_text}\n"
-
-    # Ensure parent directory exists
-    inbox_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # Atomic append with file locking
-    with open(inbox_path, "a", encoding="utf-8") as f:
-        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-        f.write(line)
-        f.flush()
-        os.fsync(f.fileno())  # Ensure durability
-        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-
+    append_lines_to_inbox([format_inbox_line(entry_id, text, source)], inbox_path)
     return entry_id
 
 
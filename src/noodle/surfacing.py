@@ -4,15 +4,29 @@ Surfacing module for Noodle.
 Push-first architecture: proactively surface relevant information.
 """
 
+import atexit
+import hashlib
+import io
 import json
 import os
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
 import httpx
 
-from noodle.config import load_config
-from noodle.db import Database
+from noodle.config import get_cache_dir, load_config
+from noodle.db import REVIEW_QUEUE_COUNT_SQL, Database
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is the fallback
+    orjson = None
 
 
 # ANSI color codes
@@ -43,33 +57,72 @@ class Colors:
     @classmethod
     def enabled(cls) -> bool:
         """Check if colors should be enabled."""
-        # Disable if NO_COLOR is set or not a tty
-        if os.environ.get("NO_COLOR"):
-            return False
-        return True
+        return _COLORS_ENABLED
+
+
+# Module-level bindings for the codes used in this module; Colors stays the public API
+_RESET = Colors.RESET
+_BOLD = Colors.BOLD
+_DIM = Colors.DIM
+_GREEN = Colors.GREEN
+_YELLOW = Colors.YELLOW
+_BLUE = Colors.BLUE
+_WHITE = Colors.WHITE
+_BR_YELLOW = Colors.BRIGHT_YELLOW
+_BR_CYAN = Colors.BRIGHT_CYAN
+_BR_MAGENTA = Colors.BRIGHT_MAGENTA
+_BR_GREEN = Colors.BRIGHT_GREEN
+
+# Resolved once at import: disable if NO_COLOR is set or stdout is not a tty
+_COLORS_ENABLED = not os.environ.get("NO_COLOR") and sys.stdout.isatty()
+
+
+@lru_cache(maxsize=None)
+def _color_prefix(codes: tuple[str, ...]) -> str:
+    """Join a tuple of color codes into a single prefix string."""
+    return "".join(codes)
 
 
 def c(text: str, *codes: str) -> str:
     """Apply color codes to text if colors are enabled."""
-    if not Colors.enabled():
+    if not _COLORS_ENABLED:
         return text
-    return "".join(codes) + text + Colors.RESET
+    return _color_prefix(codes) + text + _RESET
 
 
 # Type colors
 TYPE_COLORS = {
-    "task": Colors.BRIGHT_YELLOW,
-    "thought": Colors.BRIGHT_CYAN,
-    "person": Colors.BRIGHT_MAGENTA,
-    "event": Colors.BRIGHT_GREEN,
+    "task": _BR_YELLOW,
+    "thought": _BR_CYAN,
+    "person": _BR_MAGENTA,
+    "event": _BR_GREEN,
 }
 
 
+# Precomputed listing cells (colors are fixed at import)
+_TYPE_CELL = {etype: c(f"{etype:8}", color) for etype, color in TYPE_COLORS.items()}
+_SEQ_CELL = c("{seq:>4}", _BOLD, _WHITE)
+_ID_CELL = c("{id}", _DIM)
+_LIST_COLUMNS = c(f"{'#':>4}  {'ID':16}  {'TYPE':8}  TITLE", _DIM)
+_LIST_RULE = c("─" * 70, _DIM)
+_DONE_SUFFIX = c(" [done]", _GREEN)
+_DUE_SUFFIX = c(" [due:{}]", _YELLOW)
+
+
+def _row_template(type_cell: str) -> str:
+    """Build the listing row template around a rendered type cell."""
+    return f"{_SEQ_CELL}  {_ID_CELL}  {type_cell}  {{title}}{{extra}}"
+
+
+_ROW_FMT = {etype: _row_template(cell) for etype, cell in _TYPE_CELL.items()}
+
+
+@lru_cache(maxsize=4096)
 def format_id(entry_id: str) -> str:
     """Format entry ID with hyphens for readability (4-3-3-3 pattern)."""
-    # Remove any existing hyphens first
-    clean = entry_id.replace("-", "")
-    # Format as 4-3-3-3 (e.g., 1768-427-187-928)
+    # IDs from the database carry no hyphens; only strip when present
+    clean = entry_id.replace("-", "") if "-" in entry_id else entry_id
+    # Format as 4-3-3-3 (e.g., 1768-427-187-928); 13-digit IDs take the first branch
     if len(clean) >= 13:
         return f"{clean[:4]}-{clean[4:7]}-{clean[7:10]}-{clean[10:]}"
     elif len(clean) >= 10:
@@ -79,104 +132,181 @@ def format_id(entry_id: str) -> str:
     return clean
 
 
-def generate_daily_digest(db: Database | None = None) -> str:
+# Rendered digests, reused until the TTL expires or entries change
+DIGEST_CACHE_TTL = 5 * 60
+_DIGEST_CACHE_SIZE = 4
+_DIGEST_CACHE: dict[tuple[Any, ...], tuple[float, str]] = {}
+
+
+def _cached_digest(kind: str, db: Database, build: Callable[[Database], str]) -> str:
     """
-    Generate daily digest.
+    Return a memoized digest, rebuilding it when the data may have changed.
 
-    Format: Maximum 5 items, actionable items first.
-    Design: High signal-to-noise ratio. Trust through brevity.
+    The key holds the date plus the latest updated_at, a single read off
+    idx_entries_updated. Every insert and update sets updated_at and entries
+    are never deleted, so any write invalidates it. The TTL bounds staleness
+    from the rolling time windows, which move even when no entry changes.
     """
-    db = db or Database()
+    with db._connect() as conn:
+        last_update = conn.execute("SELECT MAX(updated_at) FROM entries").fetchone()[0]
+
     today = datetime.now(timezone.utc).date().isoformat()
+    key = (kind, str(db.db_path), today, last_update)
+
+    cached = _DIGEST_CACHE.get(key)
+    if cached and time.time() - cached[0] < DIGEST_CACHE_TTL:
+        return cached[1]
+
+    text = build(db)
+    _DIGEST_CACHE[key] = (time.time(), text)
+
+    # Evict oldest keys; superseded ones can never hit again
+    while len(_DIGEST_CACHE) > _DIGEST_CACHE_SIZE:
+        del _DIGEST_CACHE[next(iter(_DIGEST_CACHE))]
+
+    return text
+
+
+# Every daily digest section in one statement, rows tagged by section.
+# Params: today (due), week_ago (stale), today and tomorrow (upcoming).
+_DAILY_DIGEST_SQL = """
+    SELECT * FROM (
+        SELECT 'due', title, due_date, priority, NULL FROM entries
+        WHERE type = 'task'
+        AND completed_at IS NULL
+        AND due_date IS NOT NULL
+        AND due_date <= ?
+        ORDER BY due_date ASC, priority DESC
+        LIMIT 3
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'open', title, NULL, priority, NULL FROM entries
+        WHERE type = 'task'
+        AND completed_at IS NULL
+        AND due_date IS NULL
+        ORDER BY created_at DESC
+        LIMIT 3
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'stale', title, created_at, NULL, NULL FROM entries
+        WHERE type = 'thought'
+        AND created_at < ?
+        ORDER BY created_at DESC
+        LIMIT 2
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'upcoming', title, due_date, NULL, NULL FROM entries
+        WHERE type = 'event'
+        AND due_date >= ?
+        AND due_date <= ?
+        ORDER BY due_date ASC
+        LIMIT 2
+    )
+    UNION ALL
+    SELECT 'pending', NULL, NULL, NULL, COUNT(*) FROM entries
+    WHERE needs_reclassification = 1
+"""
+
+
+def _collect_daily_digest(db: Database) -> tuple[list[str], dict[str, Any]]:
+    """
+    Collect the daily digest.
+
+    Returns the rendered lines plus the same content as structured data
+    for LLM analysis. All sections come from one query, dispatched per row.
+    """
     now = datetime.now(timezone.utc)
+    today = now.date().isoformat()
+    week_ago = (now - timedelta(days=7)).isoformat()
+    tomorrow = (now + timedelta(days=1)).date().isoformat()
 
     lines = [f"# Noodle Daily Digest — {today}", ""]
+    digest_data: dict[str, Any] = {"date": today}
+
+    due_tasks: list[dict[str, Any]] = []
+    open_tasks: list[dict[str, Any]] = []
+    stale_thoughts: list[dict[str, Any]] = []
+    upcoming: list[dict[str, Any]] = []
+    pending = 0
 
-    # Due today or overdue
     with db._connect() as conn:
-        due_tasks = conn.execute("""
-            SELECT id, title, due_date, priority FROM entries
-            WHERE type = 'task'
-            AND completed_at IS NULL
-            AND due_date IS NOT NULL
-            AND due_date <= ?
-            ORDER BY due_date ASC, priority DESC
-            LIMIT 3
-        """, (today,)).fetchall()
+        conn.execute("PRAGMA query_only = 1")
+        for section, title, date, priority, count in conn.execute(
+            _DAILY_DIGEST_SQL, (today, week_ago, today, tomorrow)
+        ):
+            if section == "due":
+                due_tasks.append({"title": title, "priority": priority, "due_date": date})
+            elif section == "open":
+                open_tasks.append({"title": title, "priority": priority})
+            elif section == "stale":
+                stale_thoughts.append({"title": title, "created": date[:10]})
+            elif section == "upcoming":
+                upcoming.append({"title": title, "date": date})
+            else:
+                pending = count
 
+    # Due today or overdue
     if due_tasks:
         lines.append(f"## Due Today ({len(due_tasks)})")
         for task in due_tasks:
             priority_marker = "!" if task["priority"] == "high" else ""
             lines.append(f"- [ ] {priority_marker}{task['title']}")
         lines.append("")
+        digest_data["due_tasks"] = due_tasks
 
     # Incomplete tasks (no due date)
-    with db._connect() as conn:
-        open_tasks = conn.execute("""
-            SELECT id, title, priority FROM entries
-            WHERE type = 'task'
-            AND completed_at IS NULL
-            AND due_date IS NULL
-            ORDER BY created_at DESC
-            LIMIT 3
-        """).fetchall()
-
     if open_tasks:
         lines.append(f"## Open Tasks ({len(open_tasks)})")
         for task in open_tasks:
             lines.append(f"- [ ] {task['title']}")
         lines.append("")
+        digest_data["open_tasks"] = open_tasks
 
     # Recent thoughts worth revisiting (7+ days old)
-    week_ago = (now - timedelta(days=7)).isoformat()
-    with db._connect() as conn:
-        stale_thoughts = conn.execute("""
-            SELECT id, title, created_at FROM entries
-            WHERE type = 'thought'
-            AND created_at < ?
-            ORDER BY created_at DESC
-            LIMIT 2
-        """, (week_ago,)).fetchall()
-
     if stale_thoughts:
         lines.append("## Worth Revisiting")
         for thought in stale_thoughts:
-            created = thought["created_at"][:10]
-            lines.append(f"- \"{thought['title']}\" ({created})")
+            lines.append(f"- \"{thought['title']}\" ({thought['created']})")
         lines.append("")
+        digest_data["stale_thoughts"] = stale_thoughts
 
     # Upcoming events
-    tomorrow = (now + timedelta(days=1)).date().isoformat()
-    with db._connect() as conn:
-        upcoming = conn.execute("""
-            SELECT id, title, due_date FROM entries
-            WHERE type = 'event'
-            AND due_date >= ?
-            AND due_date <= ?
-            ORDER BY due_date ASC
-            LIMIT 2
-        """, (today, tomorrow)).fetchall()
-
     if upcoming:
         lines.append("## Upcoming")
         for event in upcoming:
-            lines.append(f"- {event['title']} ({event['due_date']})")
+            lines.append(f"- {event['title']} ({event['date']})")
         lines.append("")
+        digest_data["upcoming_events"] = upcoming
 
     # Manual review queue count
-    with db._connect() as conn:
-        pending = conn.execute("""
-            SELECT COUNT(*) FROM entries WHERE needs_reclassification = 1
-        """).fetchone()[0]
-
     if pending > 0:
         lines.append(f"---\n{pending} items in manual review queue")
+        digest_data["pending_review"] = pending
 
     # If nothing to show
     if len(lines) <= 2:
         lines.append("Nothing urgent today. You're all caught up.")
+        digest_data["empty"] = True
+
+    return lines, digest_data
+
+
+def generate_daily_digest(db: Database | None = None) -> str:
+    """
+    Generate daily digest.
+
+    Format: Maximum 5 items, actionable items first.
+    Design: High signal-to-noise ratio. Trust through brevity.
+    """
+    return _cached_digest("daily", db or Database(), _build_daily_digest)
 
+
+def _build_daily_digest(db: Database) -> str:
+    """Render the daily digest uncached."""
+    lines, _ = _collect_daily_digest(db)
     return "\n".join(lines)
 
 
@@ -186,97 +316,99 @@ def generate_weekly_review(db: Database | None = None) -> str:
 
     Format: Rolling 7-day window. NO BACKLOG. No guilt.
     """
-    db = db or Database()
+    return _cached_digest("weekly", db or Database(), _build_weekly_review)
+
+
+def _build_weekly_review(db: Database) -> str:
+    """Render the weekly review uncached."""
     now = datetime.now(timezone.utc)
     week_ago = (now - timedelta(days=7)).isoformat()
     today = now.date().isoformat()
 
     lines = [f"# Noodle Weekly Review — {today}", ""]
 
-    # This week's stats
+    # One read-only connection and transaction for every section
     with db._connect() as conn:
-        # Total captured
-        captured = conn.execute("""
-            SELECT COUNT(*) FROM entries WHERE created_at >= ?
-        """, (week_ago,)).fetchone()[0]
+        conn.execute("PRAGMA query_only = 1")
+        conn.execute("BEGIN")
+
+        # This week's stats: captured per type (most first) off idx_entries_created
+        by_type = {
+            row["type"]: row["cnt"]
+            for row in conn.execute("""
+                SELECT type, COUNT(*) as cnt FROM entries
+                WHERE created_at >= ?
+                GROUP BY type
+                ORDER BY cnt DESC, type
+            """, (week_ago,))
+        }
 
-        # Completed tasks
+        # Completed tasks may have been created before this week; a covering
+        # read of idx_tasks_due rather than an OR that defeats every index
         completed = conn.execute("""
             SELECT COUNT(*) FROM entries
             WHERE type = 'task' AND completed_at >= ?
         """, (week_ago,)).fetchone()[0]
 
-        # Created tasks
-        created_tasks = conn.execute("""
-            SELECT COUNT(*) FROM entries
-            WHERE type = 'task' AND created_at >= ?
-        """, (week_ago,)).fetchone()[0]
-
-        # By type
-        by_type = dict(conn.execute("""
-            SELECT type, COUNT(*) FROM entries
-            WHERE created_at >= ?
-            GROUP BY type
-        """, (week_ago,)).fetchall())
-
-    lines.append("## This Week")
-    lines.append(f"- Captured: {captured} entries")
-    lines.append(f"- Completed: {completed} tasks")
-    lines.append(f"- Created: {created_tasks} tasks")
-
-    delta = completed - created_tasks
-    if delta > 0:
-        lines.append(f"- Net: +{delta} (making progress!)")
-    elif delta < 0:
-        lines.append(f"- Net: {delta} (backlog growing)")
-    else:
-        lines.append("- Net: 0 (holding steady)")
-    lines.append("")
-
-    # Breakdown by type
-    if by_type:
-        lines.append("## By Type")
-        for entry_type, count in sorted(by_type.items(), key=lambda x: -x[1]):
-            lines.append(f"- {entry_type}: {count}")
+        captured = sum(by_type.values())
+        created_tasks = by_type.get("task", 0)
+
+        lines.append("## This Week")
+        lines.append(f"- Captured: {captured} entries")
+        lines.append(f"- Completed: {completed} tasks")
+        lines.append(f"- Created: {created_tasks} tasks")
+
+        delta = completed - created_tasks
+        if delta > 0:
+            lines.append(f"- Net: +{delta} (making progress!)")
+        elif delta < 0:
+            lines.append(f"- Net: {delta} (backlog growing)")
+        else:
+            lines.append("- Net: 0 (holding steady)")
         lines.append("")
 
-    # Top projects
-    with db._connect() as conn:
-        projects = conn.execute("""
-            SELECT project_id, COUNT(*) as cnt FROM entries
-            WHERE project_id IS NOT NULL AND created_at >= ?
-            GROUP BY project_id
-            ORDER BY cnt DESC
-            LIMIT 3
-        """, (week_ago,)).fetchall()
-
-    if projects:
-        lines.append("## Top Projects")
-        for i, proj in enumerate(projects, 1):
-            lines.append(f"{i}. {proj['project_id']} ({proj['cnt']} entries)")
-        lines.append("")
+        # Breakdown by type
+        if by_type:
+            lines.append("## By Type")
+            for entry_type, count in by_type.items():
+                lines.append(f"- {entry_type}: {count}")
+            lines.append("")
 
-    # Ideas worth revisiting
-    with db._connect() as conn:
-        thoughts = conn.execute("""
-            SELECT title, created_at FROM entries
-            WHERE type = 'thought' AND created_at >= ?
-            ORDER BY created_at DESC
-            LIMIT 3
-        """, (week_ago,)).fetchall()
-
-    if thoughts:
-        lines.append("## Ideas This Week")
-        for thought in thoughts:
-            created = thought["created_at"][:10]
-            lines.append(f"- \"{thought['title']}\" ({created})")
-        lines.append("")
+        # Top projects
+        projects = [
+            f"{i}. {proj['project_id']} ({proj['cnt']} entries)"
+            for i, proj in enumerate(conn.execute("""
+                SELECT project_id, COUNT(*) as cnt FROM entries
+                WHERE project_id IS NOT NULL AND created_at >= ?
+                GROUP BY project_id
+                ORDER BY cnt DESC
+                LIMIT 3
+            """, (week_ago,)), 1)
+        ]
+
+        if projects:
+            lines.append("## Top Projects")
+            lines.extend(projects)
+            lines.append("")
 
-    # Pending review
-    with db._connect() as conn:
-        pending = conn.execute("""
-            SELECT COUNT(*) FROM entries WHERE needs_reclassification = 1
-        """).fetchone()[0]
+        # Ideas worth revisiting
+        thoughts = [
+            f"- \"{thought['title']}\" ({thought['created_at'][:10]})"
+            for thought in conn.execute("""
+                SELECT title, created_at FROM entries
+                WHERE type = 'thought' AND created_at >= ?
+                ORDER BY created_at DESC
+                LIMIT 3
+            """, (week_ago,))
+        ]
+
+        if thoughts:
+            lines.append("## Ideas This Week")
+            lines.extend(thoughts)
+            lines.append("")
+
+        # Pending review
+        pending = conn.execute(REVIEW_QUEUE_COUNT_SQL).fetchone()[0]
 
     if pending > 0:
         lines.append(f"---\nManual review queue: {pending} items")
@@ -284,6 +416,35 @@ def generate_weekly_review(db: Database | None = None) -> str:
     return "\n".join(lines)
 
 
+def _render_listing(heading: str, entries: list[tuple[Any, ...]], show_status: bool) -> str:
+    """Render BRIEF_COLUMNS rows (see Database.get_entries_brief) as a table."""
+    buf = io.StringIO()
+    buf.write(c(heading, _BOLD, _BLUE))
+    buf.write("\n\n")
+    buf.write(_LIST_COLUMNS)
+    buf.write("\n")
+    buf.write(_LIST_RULE)
+
+    for entry_id, seq, etype, title, due_date, completed_at in entries:
+        extra = ""
+        if show_status and etype == "task":
+            if completed_at:
+                extra = _DONE_SUFFIX
+            elif due_date:
+                extra = _DUE_SUFFIX.format(due_date)
+
+        template = _ROW_FMT.get(etype) or _row_template(c(f"{etype:8}", ""))
+        buf.write("\n")
+        buf.write(template.format(
+            seq=seq,
+            id=format_id(entry_id),
+            title=title,
+            extra=extra,
+        ))
+
+    return buf.getvalue()
+
+
 def get_entries_formatted(
     db: Database | None = None,
     entry_type: str | None = None,
@@ -294,7 +455,7 @@ def get_entries_formatted(
 ) -> str:
     """Get entries as formatted string with colors."""
     db = db or Database()
-    entries = db.get_entries(
+    entries = db.get_entries_brief(
         entry_type=entry_type,
         project=project,
         limit=limit,
@@ -303,76 +464,24 @@ def get_entries_formatted(
     )
 
     if not entries:
-        return c("No entries found.", Colors.DIM)
-
-    lines = []
+        return c("No entries found.", _DIM)
 
-    # Header
     header_text = "ENTRIES"
     if entry_type:
         header_text = f"{entry_type.upper()}S"
-    lines.append(c(f"━━━ {header_text} ━━━", Colors.BOLD, Colors.BLUE))
-    lines.append("")
-
-    # Column header
-    lines.append(c(f"{'#':>4}  {'ID':16}  {'TYPE':8}  TITLE", Colors.DIM))
-    lines.append(c("─" * 70, Colors.DIM))
-
-    for entry in entries:
-        seq = entry.get("seq", "?")
-        full_id = format_id(entry["id"])
-        etype = entry["type"]
-        title = entry["title"][:42]
-        type_color = TYPE_COLORS.get(etype, "")
-
-        extra = ""
-        if etype == "task":
-            if entry["completed_at"]:
-                extra = c(" [done]", Colors.GREEN)
-            elif entry["due_date"]:
-                extra = c(f" [due:{entry['due_date']}]", Colors.YELLOW)
-
-        seq_str = c(f"{seq:>4}", Colors.BOLD, Colors.WHITE)
-        id_str = c(full_id, Colors.DIM)
-        type_str = c(f"{etype:8}", type_color)
 
-        lines.append(f"{seq_str}  {id_str}  {type_str}  {title}{extra}")
-
-    return "\n".join(lines)
+    return _render_listing(f"━━━ {header_text} ━━━", entries, show_status=True)
 
 
 def search_entries_formatted(query: str, db: Database | None = None, limit: int = 20) -> str:
     """Search entries and return formatted string with colors."""
     db = db or Database()
-    entries = db.search(query, limit=limit)
+    entries = db.search_brief(query, limit=limit)
 
     if not entries:
-        return c(f"No entries matching '{query}'.", Colors.DIM)
+        return c(f"No entries matching '{query}'.", _DIM)
 
-    lines = []
-
-    # Header
-    lines.append(c(f"━━━ SEARCH: {query} ━━━", Colors.BOLD, Colors.BLUE))
-    lines.append("")
-
-    # Column header
-    lines.append(c(f"{'#':>4}  {'ID':16}  {'TYPE':8}  TITLE", Colors.DIM))
-    lines.append(c("─" * 70, Colors.DIM))
-
-    for entry in entries:
-        seq = entry.get("seq", "?")
-        full_id = format_id(entry["id"])
-        etype = entry["type"]
-        title = entry["title"][:42]
-        type_color = TYPE_COLORS.get(etype, "")
-
-        seq_str = c(f"{seq:>4}", Colors.BOLD, Colors.WHITE)
-        id_str = c(full_id, Colors.DIM)
-        type_str = c(f"{etype:8}", type_color)
-
-        lines.append(f"{seq_str}  {id_str}  {type_str}  {title}")
-
-    return "\n".join(lines)
+    return _render_listing(f"━━━ SEARCH: {query} ━━━", entries, show_status=False)
 
 
 # LLM Analysis for Digest
@@ -391,8 +500,13 @@ Provide brief, actionable analysis (2-4 sentences max). Consider:
 Be direct and practical. No fluff. No emojis. Keep it under 100 words."""
 
 
+@lru_cache(maxsize=1)
 def _get_llm_config() -> dict[str, Any]:
-    """Get LLM configuration from config file or environment."""
+    """
+    Get LLM configuration from config file or environment.
+
+    Cached for the process lifetime; call _get_llm_config.cache_clear() to reload.
+    """
     config = load_config()
     llm_config = config.get("llm", {})
 
@@ -425,6 +539,22 @@ def _get_llm_config() -> dict[str, Any]:
         }
 
 
+# Shared client so repeated digests reuse the TLS connection
+_LLM_CLIENT: httpx.Client | None = None
+
+
+def _get_http_client() -> httpx.Client:
+    """Get the shared HTTP client for LLM calls, creating it on first use."""
+    global _LLM_CLIENT
+    if _LLM_CLIENT is None:
+        _LLM_CLIENT = httpx.Client(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=120.0),
+        )
+        atexit.register(_LLM_CLIENT.close)
+    return _LLM_CLIENT
+
+
 def _call_llm_for_analysis(prompt: str) -> str | None:
     """Call LLM for digest analysis. Returns None on failure."""
     config = _get_llm_config()
@@ -433,44 +563,74 @@ def _call_llm_for_analysis(prompt: str) -> str | None:
         return None
 
     try:
-        with httpx.Client(timeout=30.0) as client:
-            if config["provider"] == "anthropic":
-                response = client.post(
-                    f"{config['base_url']}/messages",
-                    headers={
-                        "x-api-key": config["api_key"],
-                        "Content-Type": "application/json",
-                        "anthropic-version": "2023-06-01",
-                    },
-                    json={
-                        "model": config["model"],
-                        "max_tokens": 256,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.5,
-                    },
-                )
-                response.raise_for_status()
-                return response.json()["content"][0]["text"]
-            else:
-                response = client.post(
-                    f"{config['base_url']}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {config['api_key']}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": config["model"],
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.5,
-                        "max_tokens": 256,
-                    },
-                )
-                response.raise_for_status()
-                return response.json()["choices"][0]["message"]["content"]
+        client = _get_http_client()
+        if config["provider"] == "anthropic":
+            response = client.post(
+                f"{config['base_url']}/messages",
+                headers={
+                    "x-api-key": config["api_key"],
+                    "Content-Type": "application/json",
+                    "anthropic-version": "2023-06-01",
+                },
+                json={
+                    "model": config["model"],
+                    "max_tokens": 256,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.5,
+                },
+            )
+            response.raise_for_status()
+            return response.json()["content"][0]["text"]
+        else:
+            response = client.post(
+                f"{config['base_url']}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {config['api_key']}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": config["model"],
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.5,
+                    "max_tokens": 256,
+                },
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
     except Exception:
         return None
 
 
+# Seconds a cached digest analysis stays valid
+LLM_CACHE_TTL = 24 * 60 * 60
+
+
+def _prune_llm_cache(cache_dir: Path) -> None:
+    """Delete cached analyses older than LLM_CACHE_TTL; they can never be read again."""
+    cutoff = time.time() - LLM_CACHE_TTL
+    for path in cache_dir.iterdir():
+        try:
+            if path.suffix == ".txt" and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def _dumps(data: Any, indent: bool = False) -> str:
+    """
+    Serialize data to JSON, using orjson when available (the `speed` extra).
+
+    The stdlib fallback is configured to match orjson's output: compact
+    separators and non-ASCII text left unescaped.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NAIVE_UTC | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=str, option=option).decode()
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=str)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
 def analyze_digest_with_llm(digest_data: dict[str, Any]) -> str | None:
     """
     Get LLM analysis of digest data.
@@ -481,10 +641,29 @@ def analyze_digest_with_llm(digest_data: dict[str, Any]) -> str | None:
     Returns:
         Analysis string or None if LLM unavailable.
     """
-    # Format digest data for the prompt
-    data_str = json.dumps(digest_data, indent=2, default=str)
+    # Compact JSON: cheaper to serialize and fewer input tokens
+    data_str = _dumps(digest_data)
     prompt = DIGEST_ANALYSIS_PROMPT.format(digest_data=data_str)
-    return _call_llm_for_analysis(prompt)
+
+    # Reuse the analysis for identical digest data (e.g. repeated digest runs)
+    key = hashlib.sha256(f"{_get_llm_config()['model']}\n{prompt}".encode()).hexdigest()
+    cache_dir = get_cache_dir() / "llm"
+    cache_path = cache_dir / f"{key}.txt"
+    try:
+        if time.time() - cache_path.stat().st_mtime < LLM_CACHE_TTL:
+            return cache_path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+
+    analysis = _call_llm_for_analysis(prompt)
+    if analysis:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(analysis, encoding="utf-8")
+            _prune_llm_cache(cache_dir)
+        except OSError:
+            pass  # Caching is best-effort
+    return analysis
 
 
 def get_entries_by_tag(
@@ -510,8 +689,11 @@ def get_entries_by_tag(
 
         query += " ORDER BY e.created_at DESC"
 
-        rows = conn.execute(query, params).fetchall()
-        return [dict(row) for row in rows]
+        return [dict(row) for row in conn.execute(query, params)]
+
+
+# Dev context entry block; optional parts are pre-rendered (or empty)
+_DEV_ENTRY_TMPL = "### #{seq}: {title}{body_block}\n\n*Created: {created}*{proj_line}\n"
 
 
 def generate_dev_context(
@@ -537,7 +719,6 @@ def generate_dev_context(
         return f"No entries with tag #{tag} found."
 
     if format == "json":
-        import json
         simplified = []
         for e in entries:
             simplified.append({
@@ -549,7 +730,7 @@ def generate_dev_context(
                 "created": e["created_at"][:10],
                 "project": e.get("project_id"),
             })
-        return json.dumps(simplified, indent=2)
+        return _dumps(simplified, indent=True)
 
     # Markdown format (default)
     lines = [
@@ -560,30 +741,25 @@ def generate_dev_context(
     ]
 
     # Group by type
-    by_type: dict[str, list] = {}
+    by_type: defaultdict[str, list] = defaultdict(list)
     for entry in entries:
-        etype = entry["type"]
-        if etype not in by_type:
-            by_type[etype] = []
-        by_type[etype].append(entry)
+        by_type[entry["type"]].append(entry)
 
     for etype, items in sorted(by_type.items()):
         lines.append(f"## {etype.title()}s ({len(items)})")
         lines.append("")
 
+        # One rendered block per entry rather than a line-by-line build
         for entry in items:
-            seq = entry.get("seq", "?")
-            lines.append(f"### #{seq}: {entry['title']}")
-
-            if entry.get("body"):
-                lines.append(f"")
-                lines.append(entry["body"])
-
-            lines.append(f"")
-            lines.append(f"*Created: {entry['created_at'][:10]}*")
-            if entry.get("project_id"):
-                lines.append(f"*Project: {entry['project_id']}*")
-            lines.append("")
+            body = entry.get("body")
+            project = entry.get("project_id")
+            lines.append(_DEV_ENTRY_TMPL.format(
+                seq=entry.get("seq", "?"),
+                title=entry["title"],
+                body_block=f"\n\n{body}" if body else "",
+                created=entry["created_at"][:10],
+                proj_line=f"\n*Project: {project}*" if project else "",
+            ))
 
     return "\n".join(lines)
 
@@ -594,125 +770,10 @@ def generate_daily_digest_enhanced(db: Database | None = None) -> str:
 
     Same as generate_daily_digest but adds an AI analysis section.
     """
-    db = db or Database()
-    today = datetime.now(timezone.utc).date().isoformat()
-    now = datetime.now(timezone.utc)
-
-    lines = [f"# Noodle Daily Digest — {today}", ""]
-
-    # Collect data for LLM analysis
-    digest_data: dict[str, Any] = {"date": today}
-
-    # Due today or overdue
-    with db._connect() as conn:
-        due_tasks = conn.execute("""
-            SELECT id, title, due_date, priority FROM entries
-            WHERE type = 'task'
-            AND completed_at IS NULL
-            AND due_date IS NOT NULL
-            AND due_date <= ?
-            ORDER BY due_date ASC, priority DESC
-            LIMIT 3
-        """, (today,)).fetchall()
-
-    if due_tasks:
-        lines.append(f"## Due Today ({len(due_tasks)})")
-        digest_data["due_tasks"] = []
-        for task in due_tasks:
-            priority_marker = "!" if task["priority"] == "high" else ""
-            lines.append(f"- [ ] {priority_marker}{task['title']}")
-            digest_data["due_tasks"].append({
-                "title": task["title"],
-                "priority": task["priority"],
-                "due_date": task["due_date"],
-            })
-        lines.append("")
-
-    # Incomplete tasks (no due date)
-    with db._connect() as conn:
-        open_tasks = conn.execute("""
-            SELECT id, title, priority FROM entries
-            WHERE type = 'task'
-            AND completed_at IS NULL
-            AND due_date IS NULL
-            ORDER BY created_at DESC
-            LIMIT 3
-        """).fetchall()
-
-    if open_tasks:
-        lines.append(f"## Open Tasks ({len(open_tasks)})")
-        digest_data["open_tasks"] = []
-        for task in open_tasks:
-            lines.append(f"- [ ] {task['title']}")
-            digest_data["open_tasks"].append({
-                "title": task["title"],
-                "priority": task["priority"],
-            })
-        lines.append("")
-
-    # Recent thoughts worth revisiting (7+ days old)
-    week_ago = (now - timedelta(days=7)).isoformat()
-    with db._connect() as conn:
-        stale_thoughts = conn.execute("""
-            SELECT id, title, created_at FROM entries
-            WHERE type = 'thought'
-            AND created_at < ?
-            ORDER BY created_at DESC
-            LIMIT 2
-        """, (week_ago,)).fetchall()
-
-    if stale_thoughts:
-        lines.append("## Worth Revisiting")
-        digest_data["stale_thoughts"] = []
-        for thought in stale_thoughts:
-            created = thought["created_at"][:10]
-            lines.append(f"- \"{thought['title']}\" ({created})")
-            digest_data["stale_thoughts"].append({
-                "title": thought["title"],
-                "created": created,
-            })
-        lines.append("")
-
-    # Upcoming events
-    tomorrow = (now + timedelta(days=1)).date().isoformat()
-    with db._connect() as conn:
-        upcoming = conn.execute("""
-            SELECT id, title, due_date FROM entries
-            WHERE type = 'event'
-            AND due_date >= ?
-            AND due_date <= ?
-            ORDER BY due_date ASC
-            LIMIT 2
-        """, (today, tomorrow)).fetchall()
-
-    if upcoming:
-        lines.append("## Upcoming")
-        digest_data["upcoming_events"] = []
-        for event in upcoming:
-            lines.append(f"- {event['title']} ({event['due_date']})")
-            digest_data["upcoming_events"].append({
-                "title": event["title"],
-                "date": event["due_date"],
-            })
-        lines.append("")
-
-    # Manual review queue count
-    with db._connect() as conn:
-        pending = conn.execute("""
-            SELECT COUNT(*) FROM entries WHERE needs_reclassification = 1
-        """).fetchone()[0]
-
-    if pending > 0:
-        lines.append(f"---\n{pending} items in manual review queue")
-        digest_data["pending_review"] = pending
-
-    # If nothing to show
-    if len(lines) <= 2:
-        lines.append("Nothing urgent today. You're all caught up.")
-        digest_data["empty"] = True
+    lines, digest_data = _collect_daily_digest(db or Database())
 
     # Add LLM analysis if we have content
-    if digest_data and not digest_data.get("empty"):
+    if not digest_data.get("empty"):
         analysis = analyze_digest_with_llm(digest_data)
         if analysis:
             lines.append("")
@@ -4,11 +4,17 @@ Telegram bot for Noodle.
 Mobile ingress and remote access via Telegram.
 """
 
+import asyncio
 import logging
 import os
+import random
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from functools import lru_cache, wraps
 from typing import Any
 
-from telegram import Update
+from telegram import Message, Update
+from telegram.error import RetryAfter
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -18,10 +24,15 @@ from telegram.ext import (
 )
 
 from noodle.config import ensure_dirs, get_inbox_path, load_config
-from noodle.ingress import append_to_inbox
+from noodle.inbox_batcher import get_inbox_batcher
 from noodle.db import Database
 from noodle.surfacing import format_id
 
+try:
+    import uvloop
+except ImportError:  # `speed` extra; the default asyncio loop is the fallback
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -29,9 +40,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+Handler = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]]
+
+# Concurrent sends, kept under Telegram's ~30 messages/second per-bot limit
+_SEND_LIMIT = asyncio.Semaphore(25)
+_SEND_RETRIES = 3
+
+# Title length for entry listings, truncated in SQL by the brief queries
+_TITLE_LENGTH = 40
+
+# Captures: text messages that are not commands, or captioned media;
+# built once at import
+_TEXT_NONCMD_FILTER = (filters.TEXT & ~filters.COMMAND) | filters.CAPTION
+
+# Command summaries shared by /start and /help, joined once at import
+_COMMAND_LINES = "\n".join([
+    "/tasks - List open tasks",
+    "/thoughts - List recent thoughts",
+    "/list [type] - List entries",
+    "/done <id> - Complete a task",
+    "/archive <id> - Archive an entry",
+    "/find <query> - Search entries",
+    "/digest - Daily digest",
+    "/analyze - Daily digest with LLM analysis",
+    "/weekly - Weekly review",
+    "/id - Show your user ID",
+])
+
+_START_TEXT = (
+    "Noodle bot ready. Send any message to capture it.\n\n"
+    f"Commands:\n{_COMMAND_LINES}"
+)
+
+_HELP_TEXT = (
+    f"Noodle Commands:\n\n{_COMMAND_LINES}\n"
+    "/help - Show this message\n\n"
+    "Send any text to capture it."
+)
+
+_START_UNAUTHORIZED = (
+    "Unauthorized. Your user ID: {user_id}\n"
+    "Add this ID to NOODLE_TELEGRAM_USERS to authorize."
+)
+
 
+@lru_cache(maxsize=1)
 def get_bot_config() -> dict[str, Any]:
-    """Get bot configuration."""
+    """
+    Get bot configuration.
+
+    Cached for the process lifetime; call get_bot_config.cache_clear() to reload.
+    """
     config = load_config()
     bot_config = config.get("telegram", {})
 
@@ -44,78 +103,139 @@ def get_bot_config() -> dict[str, Any]:
         )
 
     # Authorized user IDs (comma-separated in env, list in config)
-    authorized = bot_config.get("authorized_users", [])
+    authorized = frozenset(bot_config.get("authorized_users", []))
     if not authorized:
         env_users = os.environ.get("NOODLE_TELEGRAM_USERS", "")
         if env_users:
-            authorized = [int(uid.strip()) for uid in env_users.split(",") if uid.strip()]
+            authorized = frozenset(
+                int(uid) for uid in map(str.strip, env_users.split(",")) if uid
+            )
+
+    # Webhook mode: public base URL Telegram posts updates to. Without one, or
+    # with NOODLE_TELEGRAM_POLLING=1 (local development), the bot long-polls.
+    webhook_url = bot_config.get("webhook_url") or os.environ.get("NOODLE_TELEGRAM_WEBHOOK_URL")
+    if os.environ.get("NOODLE_TELEGRAM_POLLING") == "1":
+        webhook_url = None
+    webhook_port = int(
+        bot_config.get("webhook_port")
+        or os.environ.get("NOODLE_TELEGRAM_WEBHOOK_PORT")
+        or 8443
+    )
 
     return {
         "token": token,
-        "authorized_users": set(authorized),
+        "authorized_users": authorized,
+        "webhook_url": webhook_url,
+        "webhook_port": webhook_port,
     }
 
 
-def is_authorized(user_id: int, authorized_users: set[int]) -> bool:
-    """Check if user is authorized."""
-    # If no users configured, deny all (secure default)
-    if not authorized_users:
-        return False
-    return user_id in authorized_users
+def _authed(
+    handler: Handler,
+    authorized_users: frozenset[int],
+    denied: str = "Unauthorized. Your ID: {user_id}",
+) -> Handler:
+    """
+    Wrap a handler so it only runs for authorized users.
+
+    The user set is captured once at registration, so each update costs a
+    single membership test. Unauthorized users get `denied` formatted with
+    their user ID.
+    """
+    @wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if not update.effective_user or not update.message:
+            return
+
+        user_id = update.effective_user.id
 
+        # Security: an empty set denies everyone (secure default). Membership
+        # alone covers that case, so no separate emptiness check is needed.
+        if user_id not in authorized_users:
+            logger.warning(f"Unauthorized attempt from user {user_id}")
+            await _safe_reply(update.message, denied.format(user_id=user_id))
+            return
 
-def format_entries_telegram(entries: list[dict], title: str, limit: int = 10) -> str:
-    """Format entries for Telegram (plain text, compact)."""
+        await handler(update, context)
+
+    return wrapper
+
+
+async def _safe_reply(message: Message, text: str) -> None:
+    """
+    Reply within the send limit, retrying when Telegram applies flood control.
+
+    Each retry waits the delay Telegram asks for plus jitter, so handlers
+    throttled together don't retry in lockstep.
+    """
+    async with _SEND_LIMIT:
+        for attempt in range(_SEND_RETRIES):
+            try:
+                await message.reply_text(text)
+                return
+            except RetryAfter as e:
+                if attempt == _SEND_RETRIES - 1:
+                    raise
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                logger.warning(f"Flood control, retrying in {delay}s")
+                await asyncio.sleep(delay + random.random() * 0.5)
+
+
+async def _reply_chunked(message: Message, text: str, max_len: int = 4000) -> None:
+    """
+    Reply with text split on line boundaries into chunks of at most max_len.
+
+    Telegram rejects messages over 4096 characters. Chunks are sent in order,
+    so they are awaited one by one; a single over-long line is hard-split.
+    """
+    chunk: list[str] = []
+    size = 0
+
+    for line in text.splitlines():
+        while len(line) > max_len:
+            if chunk:
+                await _safe_reply(message, "\n".join(chunk))
+                chunk, size = [], 0
+            await _safe_reply(message, line[:max_len])
+            line = line[max_len:]
+
+        # +1 for the newline joining this line to the chunk
+        if chunk and size + 1 + len(line) > max_len:
+            await _safe_reply(message, "\n".join(chunk))
+            chunk, size = [], 0
+
+        size += len(line) + (1 if chunk else 0)
+        chunk.append(line)
+
+    if chunk:
+        await _safe_reply(message, "\n".join(chunk))
+
+
+def format_entries_telegram(entries: list[tuple], title: str, limit: int = 10) -> str:
+    """
+    Format BRIEF_COLUMNS rows for Telegram (plain text, compact).
+
+    Titles arrive already cut to _TITLE_LENGTH by the query, so none are sliced here.
+    """
     if not entries:
         return f"{title}\n\nNo entries found."
 
-    lines = [f"{title}", ""]
-
-    for entry in entries[:limit]:
-        seq = entry.get("seq", "?")
-        etype = entry["type"]
-        entry_title = entry["title"][:40]
-
-        extra = ""
-        if etype == "task" and entry.get("due_date"):
-            extra = f" [due:{entry['due_date']}]"
-
-        lines.append(f"#{seq} [{etype}] {entry_title}{extra}")
+    body = "\n".join(
+        f"#{seq} [{etype}] {entry_title}"
+        + (f" [due:{due_date}]" if etype == "task" and due_date else "")
+        for _, seq, etype, entry_title, due_date, _ in entries[:limit]
+    )
 
     if len(entries) > limit:
-        lines.append(f"\n... and {len(entries) - limit} more")
-
-    return "\n".join(lines)
+        return f"{title}\n\n{body}\n\n... and {len(entries) - limit} more"
+    return f"{title}\n\n{body}"
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start command."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if is_authorized(user_id, authorized_users):
-        await update.message.reply_text(
-            "Noodle bot ready. Send any message to capture it.\n\n"
-            "Commands:\n"
-            "/tasks - List open tasks\n"
-            "/thoughts - List recent thoughts\n"
-            "/list [type] - List entries\n"
-            "/done <id> - Complete a task\n"
-            "/archive <id> - Archive an entry\n"
-            "/find <query> - Search entries\n"
-            "/digest - Daily digest\n"
-            "/analyze - Daily digest with LLM analysis\n"
-            "/weekly - Weekly review\n"
-            "/id - Show your user ID"
-        )
-    else:
-        await update.message.reply_text(
-            f"Unauthorized. Your user ID: {user_id}\n"
-            "Add this ID to NOODLE_TELEGRAM_USERS to authorize."
-        )
+    await _safe_reply(update.message, _START_TEXT)
 
 
 async def id_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -124,7 +244,7 @@ async def id_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         return
 
     user_id = update.effective_user.id
-    await update.message.reply_text(f"Your Telegram user ID: {user_id}")
+    await _safe_reply(update.message, f"Your Telegram user ID: {user_id}")
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -132,313 +252,228 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     if not update.effective_user:
         return
 
-    await update.message.reply_text(
-        "Noodle Commands:\n\n"
-        "/tasks - List open tasks\n"
-        "/thoughts - List recent thoughts\n"
-        "/list [type] - List entries\n"
-        "/done <id> - Complete a task\n"
-        "/archive <id> - Archive an entry\n"
-        "/find <query> - Search entries\n"
-        "/digest - Daily digest\n"
-        "/analyze - Daily digest with LLM analysis\n"
-        "/weekly - Weekly review\n"
-        "/id - Show your user ID\n"
-        "/help - Show this message\n\n"
-        "Send any text to capture it."
-    )
+    await _safe_reply(update.message, _HELP_TEXT)
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle incoming messages - capture to noodle."""
-    if not update.effective_user or not update.message:
-        return
-
     user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
 
-    # Security: only process messages from authorized users
-    if not is_authorized(user_id, authorized_users):
-        logger.warning(f"Unauthorized message attempt from user {user_id}")
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
+    # The filter guarantees one of these is set; only the caption of media is kept
+    text = update.message.text or update.message.caption
 
-    # Get message text
-    text = update.message.text
-    if not text:
-        await update.message.reply_text("Only text messages are supported.")
-        return
-
-    # Capture to inbox
+    # Capture to inbox; replies only once the line is on disk
     try:
-        ensure_dirs()
-        inbox_path = get_inbox_path()
-        entry_id = append_to_inbox(text, inbox_path, source="telegram")
+        entry_id = await context.bot_data["inbox_batcher"].capture(text, source="telegram")
 
-        await update.message.reply_text(f"Captured: {entry_id}")
+        await _safe_reply(update.message, f"Captured: {entry_id}")
         logger.info(f"Captured from Telegram user {user_id}: {entry_id}")
 
     except Exception as e:
         logger.error(f"Failed to capture: {e}")
-        await update.message.reply_text(f"Error capturing thought: {e}")
+        await _safe_reply(update.message, f"Error capturing thought: {e}")
 
 
 async def tasks_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /tasks command - list open tasks."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     try:
-        db = Database()
-        entries = db.get_entries(entry_type="task", limit=15)
+        db = context.bot_data["db"]
+        entries = db.get_entries_brief(entry_type="task", limit=15, title_length=_TITLE_LENGTH)
         response = format_entries_telegram(entries, "TASKS")
-        await update.message.reply_text(response)
+        await _safe_reply(update.message, response)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def thoughts_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /thoughts command - list recent thoughts."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     try:
-        db = Database()
-        entries = db.get_entries(entry_type="thought", limit=15)
+        db = context.bot_data["db"]
+        entries = db.get_entries_brief(entry_type="thought", limit=15, title_length=_TITLE_LENGTH)
         response = format_entries_telegram(entries, "THOUGHTS")
-        await update.message.reply_text(response)
+        await _safe_reply(update.message, response)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /list command - list entries with optional type filter."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     # Parse type argument
     entry_type = None
     if context.args:
         entry_type = context.args[0].lower()
         if entry_type not in ("task", "thought", "person", "event"):
-            await update.message.reply_text(
+            await _safe_reply(
+                update.message,
                 f"Invalid type: {entry_type}\n"
-                "Valid types: task, thought, person, event"
+                "Valid types: task, thought, person, event",
             )
             return
 
     try:
-        db = Database()
-        entries = db.get_entries(entry_type=entry_type, limit=15)
+        db = context.bot_data["db"]
+        entries = db.get_entries_brief(entry_type=entry_type, limit=15, title_length=_TITLE_LENGTH)
         title = f"{entry_type.upper()}S" if entry_type else "ENTRIES"
         response = format_entries_telegram(entries, title)
-        await update.message.reply_text(response)
+        await _safe_reply(update.message, response)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def done_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /done command - complete a task."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     if not context.args:
-        await update.message.reply_text("Usage: /done <id>")
+        await _safe_reply(update.message, "Usage: /done <id>")
         return
 
     identifier = context.args[0]
 
     try:
-        db = Database()
+        db = context.bot_data["db"]
         entry_id = db.resolve_entry_id(identifier)
         if not entry_id:
-            await update.message.reply_text(f"Entry not found: {identifier}")
+            await _safe_reply(update.message, f"Entry not found: {identifier}")
             return
 
         success = db.complete_task(entry_id)
         if success:
-            await update.message.reply_text(f"Completed: #{identifier}")
+            await _safe_reply(update.message, f"Completed: #{identifier}")
         else:
-            await update.message.reply_text(f"Not a task or already completed: {identifier}")
+            await _safe_reply(update.message, f"Not a task or already completed: {identifier}")
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def archive_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /archive command - archive an entry."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     if not context.args:
-        await update.message.reply_text("Usage: /archive <id>")
+        await _safe_reply(update.message, "Usage: /archive <id>")
         return
 
     identifier = context.args[0]
 
     try:
-        db = Database()
+        db = context.bot_data["db"]
         entry_id = db.resolve_entry_id(identifier)
         if not entry_id:
-            await update.message.reply_text(f"Entry not found: {identifier}")
+            await _safe_reply(update.message, f"Entry not found: {identifier}")
             return
 
         success = db.archive_entry(entry_id)
         if success:
-            await update.message.reply_text(f"Archived: #{identifier}")
+            await _safe_reply(update.message, f"Archived: #{identifier}")
         else:
-            await update.message.reply_text(f"Already archived: {identifier}")
+            await _safe_reply(update.message, f"Already archived: {identifier}")
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def find_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /find command - search entries."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     if not context.args:
-        await update.message.reply_text("Usage: /find <query>")
+        await _safe_reply(update.message, "Usage: /find <query>")
         return
 
     query = " ".join(context.args)
 
     try:
-        db = Database()
-        entries = db.search(query, limit=10)
+        db = context.bot_data["db"]
+        entries = db.search_brief(query, limit=10, title_length=_TITLE_LENGTH)
         response = format_entries_telegram(entries, f"SEARCH: {query}")
-        await update.message.reply_text(response)
+        await _safe_reply(update.message, response)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def digest_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /digest command - show daily digest."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     try:
         from noodle.surfacing import generate_daily_digest
-        digest = generate_daily_digest()
-        await update.message.reply_text(digest)
+        digest = generate_daily_digest(context.bot_data["db"])
+        await _reply_chunked(update.message, digest)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def analyze_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /analyze command - show daily digest with LLM analysis."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     try:
         from noodle.surfacing import generate_daily_digest_enhanced
         # Notify user this may take a moment
-        await update.message.reply_text("Analyzing...")
-        digest = generate_daily_digest_enhanced()
-        await update.message.reply_text(digest)
+        await _safe_reply(update.message, "Analyzing...")
+        digest = generate_daily_digest_enhanced(context.bot_data["db"])
+        await _reply_chunked(update.message, digest)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
 
 
 async def weekly_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /weekly command - show weekly review."""
-    if not update.effective_user:
-        return
-
-    user_id = update.effective_user.id
-    authorized_users = context.bot_data.get("authorized_users", set())
-
-    if not is_authorized(user_id, authorized_users):
-        await update.message.reply_text(f"Unauthorized. Your ID: {user_id}")
-        return
-
     try:
         from noodle.surfacing import generate_weekly_review
-        review = generate_weekly_review()
-        await update.message.reply_text(review)
+        review = generate_weekly_review(context.bot_data["db"])
+        await _reply_chunked(update.message, review)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await _safe_reply(update.message, f"Error: {e}")
+
+
+async def _start_inbox_batcher(app: Application) -> None:
+    """Start the inbox writer once the bot's event loop is running."""
+    app.bot_data["inbox_batcher"].start()
+
+
+async def _stop_inbox_batcher(app: Application) -> None:
+    """Write any queued captures on shutdown."""
+    await app.bot_data["inbox_batcher"].stop()
 
 
 def run_bot() -> None:
     """Run the Telegram bot."""
     config = get_bot_config()
 
+    # PTB creates its loop inside run_polling/run_webhook, so set the policy first
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     # Create application
-    app = Application.builder().token(config["token"]).build()
+    app = (
+        Application.builder()
+        .token(config["token"])
+        # Handle updates concurrently so a burst of messages queues up behind
+        # an in-flight inbox write and shares the next one. Order is kept:
+        # nothing awaits before capture() assigns the entry ID.
+        .concurrent_updates(True)
+        .post_init(_start_inbox_batcher)
+        .post_shutdown(_stop_inbox_batcher)
+        .build()
+    )
+
+    # Handlers close over the user set (see _authed); nothing reads it from bot_data
+    authorized = config["authorized_users"]
 
-    # Store authorized users in bot_data
-    app.bot_data["authorized_users"] = config["authorized_users"]
+    # Captures go through the process-wide inbox writer
+    ensure_dirs()
+    app.bot_data["inbox_batcher"] = get_inbox_batcher(get_inbox_path())
+
+    # One Database for all handlers; it opens a connection per operation
+    app.bot_data["db"] = Database()
 
     # Add handlers
-    app.add_handler(CommandHandler("start", start_command))
+    app.add_handler(CommandHandler(
+        "start", _authed(start_command, authorized, denied=_START_UNAUTHORIZED)
+    ))
     app.add_handler(CommandHandler("help", help_command))
     app.add_handler(CommandHandler("id", id_command))
-    app.add_handler(CommandHandler("tasks", tasks_command))
-    app.add_handler(CommandHandler("thoughts", thoughts_command))
-    app.add_handler(CommandHandler("list", list_command))
-    app.add_handler(CommandHandler("done", done_command))
-    app.add_handler(CommandHandler("archive", archive_command))
-    app.add_handler(CommandHandler("find", find_command))
-    app.add_handler(CommandHandler("digest", digest_command))
-    app.add_handler(CommandHandler("analyze", analyze_command))
-    app.add_handler(CommandHandler("weekly", weekly_command))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    app.add_handler(CommandHandler("tasks", _authed(tasks_command, authorized)))
+    app.add_handler(CommandHandler("thoughts", _authed(thoughts_command, authorized)))
+    app.add_handler(CommandHandler("list", _authed(list_command, authorized)))
+    app.add_handler(CommandHandler("done", _authed(done_command, authorized)))
+    app.add_handler(CommandHandler("archive", _authed(archive_command, authorized)))
+    app.add_handler(CommandHandler("find", _authed(find_command, authorized)))
+    app.add_handler(CommandHandler("digest", _authed(digest_command, authorized)))
+    app.add_handler(CommandHandler("analyze", _authed(analyze_command, authorized)))
+    app.add_handler(CommandHandler("weekly", _authed(weekly_command, authorized)))
+    app.add_handler(MessageHandler(_TEXT_NONCMD_FILTER, _authed(handle_message, authorized)))
 
     # Log startup info
     if config["authorized_users"]:
@@ -446,8 +481,19 @@ def run_bot() -> None:
     else:
         logger.warning("No authorized users configured! Bot will deny all messages.")
 
-    # Run bot
-    app.run_polling(allowed_updates=Update.ALL_TYPES)
+    # Run bot; only message updates have handlers, so subscribe to nothing else
+    if config["webhook_url"]:
+        # The token doubles as an unguessable URL path
+        logger.info(f"Webhook mode on port {config['webhook_port']}")
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=config["webhook_port"],
+            url_path=config["token"],
+            webhook_url=f"{config['webhook_url'].rstrip('/')}/{config['token']}",
+            allowed_updates=[Update.MESSAGE],
+        )
+    else:
+        app.run_polling(allowed_updates=[Update.MESSAGE])
 
 
 def main() -> int:
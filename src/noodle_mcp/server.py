@@ -4,269 +4,306 @@ MCP Server for Noodle.
 Exposes noodle functionality as tools for Claude Code.
 """
 
-import json
-import sys
-from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
-# Import noodle modules
+# Import noodle modules; db and surfacing (which pulls in httpx) are
+# imported where first used so the server answers initialize sooner
 from noodle.config import ensure_dirs, get_inbox_path
-from noodle.db import Database
-from noodle.ingress import append_to_inbox
-from noodle.surfacing import (
-    generate_daily_digest,
-    generate_weekly_review,
-    get_entries_formatted,
-    search_entries_formatted,
-)
+from noodle.inbox_batcher import get_inbox_batcher
+
+if TYPE_CHECKING:
+    from noodle.db import Database
+
+try:
+    import uvloop
+except ImportError:  # `speed` extra; the default asyncio loop is the fallback
+    uvloop = None
 
 # Create MCP server
 server = Server("noodle")
 
-
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available tools."""
-    return [
-        Tool(
-            name="noodle_add",
-            description="Capture a thought to the noodle inbox. Use this to save ideas, tasks, notes, or anything worth remembering.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "thought": {
-                        "type": "string",
-                        "description": "The thought to capture",
-                    },
+# Entry types noodle_retype accepts
+_VALID_TYPES = frozenset({"task", "thought", "person", "event"})
+
+# Resolved once per process; see _inbox_path and _db
+_INBOX_PATH: Path | None = None
+_DB: "Database | None" = None
+
+
+def _inbox_path() -> Path:
+    """
+    Return the inbox path, creating the data directories on first use.
+
+    No await happens between the check and the assignment, so concurrent
+    tool calls on the event loop cannot race here without a lock.
+    """
+    global _INBOX_PATH
+    if _INBOX_PATH is None:
+        ensure_dirs()
+        _INBOX_PATH = get_inbox_path()
+    return _INBOX_PATH
+
+
+def _text(text: str) -> list[TextContent]:
+    """Wrap a string as a tool result."""
+    return [TextContent(type="text", text=text)]
+
+
+def _db() -> "Database":
+    """
+    Return the shared Database, created on first use.
+
+    Database opens a connection per operation, so one instance is safe to
+    share across tool calls; this just skips the per-call schema check.
+    """
+    global _DB
+    if _DB is None:
+        from noodle.db import Database
+        _DB = Database()
+    return _DB
+
+
+# Tool definitions are static; built once at import
+_TOOLS_LIST: list[Tool] = [
+    Tool(
+        name="noodle_add",
+        description="Capture a thought to the noodle inbox. Use this to save ideas, tasks, notes, or anything worth remembering.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "thought": {
+                    "type": "string",
+                    "description": "The thought to capture",
                 },
-                "required": ["thought"],
             },
-        ),
-        Tool(
-            name="noodle_search",
-            description="Search noodle entries using full-text search. Returns matching entries.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query",
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum results to return (default: 10)",
-                        "default": 10,
-                    },
+            "required": ["thought"],
+        },
+    ),
+    Tool(
+        name="noodle_search",
+        description="Search noodle entries using full-text search. Returns matching entries.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query",
                 },
-                "required": ["query"],
-            },
-        ),
-        Tool(
-            name="noodle_tasks",
-            description="List tasks from noodle, optionally filtered by project.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project": {
-                        "type": "string",
-                        "description": "Filter by project slug (optional)",
-                    },
-                    "include_completed": {
-                        "type": "boolean",
-                        "description": "Include completed tasks (default: false)",
-                        "default": False,
-                    },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum results to return (default: 10)",
+                    "default": 10,
                 },
             },
-        ),
-        Tool(
-            name="noodle_complete",
-            description="Mark a task as completed in noodle.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "entry_id": {
-                        "type": "string",
-                        "description": "The ID of the task to complete",
-                    },
+            "required": ["query"],
+        },
+    ),
+    Tool(
+        name="noodle_tasks",
+        description="List tasks from noodle, optionally filtered by project.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project": {
+                    "type": "string",
+                    "description": "Filter by project slug (optional)",
+                },
+                "include_completed": {
+                    "type": "boolean",
+                    "description": "Include completed tasks (default: false)",
+                    "default": False,
                 },
-                "required": ["entry_id"],
-            },
-        ),
-        Tool(
-            name="noodle_digest",
-            description="Get the daily digest showing due tasks and recent entries.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-            },
-        ),
-        Tool(
-            name="noodle_weekly",
-            description="Get the weekly review showing stats and progress.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
             },
-        ),
-        Tool(
-            name="noodle_pending",
-            description="Get entries that need manual review (low confidence classifications).",
-            inputSchema={
-                "type": "object",
-                "properties": {},
+        },
+    ),
+    Tool(
+        name="noodle_complete",
+        description="Mark a task as completed in noodle.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "entry_id": {
+                    "type": "string",
+                    "description": "The ID of the task to complete",
+                },
             },
-        ),
-        Tool(
-            name="noodle_retype",
-            description="Change the type of an entry (task, thought, person, or event).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "entry_id": {
-                        "type": "string",
-                        "description": "The ID of the entry to retype",
-                    },
-                    "new_type": {
-                        "type": "string",
-                        "description": "New type: task, thought, person, or event",
-                        "enum": ["task", "thought", "person", "event"],
-                    },
+            "required": ["entry_id"],
+        },
+    ),
+    Tool(
+        name="noodle_digest",
+        description="Get the daily digest showing due tasks and recent entries.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+    Tool(
+        name="noodle_weekly",
+        description="Get the weekly review showing stats and progress.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+    Tool(
+        name="noodle_pending",
+        description="Get entries that need manual review (low confidence classifications).",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+    Tool(
+        name="noodle_retype",
+        description="Change the type of an entry (task, thought, person, or event).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "entry_id": {
+                    "type": "string",
+                    "description": "The ID of the entry to retype",
+                },
+                "new_type": {
+                    "type": "string",
+                    "description": "New type: task, thought, person, or event",
+                    "enum": ["task", "thought", "person", "event"],
                 },
-                "required": ["entry_id", "new_type"],
             },
-        ),
-        Tool(
-            name="noodle_context",
-            description="Get entries related to a topic for context. Useful when working on something and need background info.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "topic": {
-                        "type": "string",
-                        "description": "Topic to find related entries for",
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum results (default: 5)",
-                        "default": 5,
-                    },
+            "required": ["entry_id", "new_type"],
+        },
+    ),
+    Tool(
+        name="noodle_context",
+        description="Get entries related to a topic for context. Useful when working on something and need background info.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "topic": {
+                    "type": "string",
+                    "description": "Topic to find related entries for",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum results (default: 5)",
+                    "default": 5,
                 },
-                "required": ["topic"],
             },
-        ),
-    ]
+            "required": ["topic"],
+        },
+    ),
+]
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available tools."""
+    return _TOOLS_LIST
 
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls."""
+    handler = _TOOLS.get(name)
+    if handler is None:
+        return _text(f"Unknown tool: {name}")
+
     try:
-        if name == "noodle_add":
-            return await tool_add(arguments)
-        elif name == "noodle_search":
-            return await tool_search(arguments)
-        elif name == "noodle_tasks":
-            return await tool_tasks(arguments)
-        elif name == "noodle_complete":
-            return await tool_complete(arguments)
-        elif name == "noodle_digest":
-            return await tool_digest(arguments)
-        elif name == "noodle_weekly":
-            return await tool_weekly(arguments)
-        elif name == "noodle_pending":
-            return await tool_pending(arguments)
-        elif name == "noodle_retype":
-            return await tool_retype(arguments)
-        elif name == "noodle_context":
-            return await tool_context(arguments)
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
+        return await handler(arguments)
     except Exception as e:
-        return [TextContent(type="text", text=f"Error: {e}")]
+        return _text(f"Error: {e}")
 
 
 async def tool_add(args: dict) -> list[TextContent]:
     """Capture a thought."""
     thought = args.get("thought", "").strip()
     if not thought:
-        return [TextContent(type="text", text="Error: Empty thought")]
+        return _text("Error: Empty thought")
 
-    ensure_dirs()
-    inbox_path = get_inbox_path()
-    entry_id = append_to_inbox(thought, inbox_path)
+    # Shares the process-wide inbox writer with any other ingress in this process
+    entry_id = await get_inbox_batcher(_inbox_path()).capture(thought)
 
-    return [TextContent(type="text", text=f"Captured: {entry_id}")]
+    return _text(f"Captured: {entry_id}")
 
 
 async def tool_search(args: dict) -> list[TextContent]:
     """Search entries."""
+    from noodle.surfacing import search_entries_formatted
+
     query = args.get("query", "").strip()
     limit = args.get("limit", 10)
 
     if not query:
-        return [TextContent(type="text", text="Error: Empty query")]
+        return _text("Error: Empty query")
 
-    result = search_entries_formatted(query, limit=limit)
-    return [TextContent(type="text", text=result)]
+    result = search_entries_formatted(query, _db(), limit=limit)
+    return _text(result)
 
 
 async def tool_tasks(args: dict) -> list[TextContent]:
     """List tasks."""
+    from noodle.surfacing import get_entries_formatted
+
     project = args.get("project")
     include_completed = args.get("include_completed", False)
 
     result = get_entries_formatted(
+        _db(),
         entry_type="task",
         project=project,
         include_completed=include_completed,
     )
-    return [TextContent(type="text", text=result)]
+    return _text(result)
 
 
 async def tool_complete(args: dict) -> list[TextContent]:
     """Complete a task."""
     entry_id = args.get("entry_id", "").strip()
     if not entry_id:
-        return [TextContent(type="text", text="Error: No entry_id provided")]
+        return _text("Error: No entry_id provided")
 
-    db = Database()
+    db = _db()
     success = db.complete_task(entry_id)
 
     if success:
-        return [TextContent(type="text", text=f"Completed: {entry_id}")]
+        return _text(f"Completed: {entry_id}")
     else:
-        return [TextContent(type="text", text=f"Not found or not a task: {entry_id}")]
+        return _text(f"Not found or not a task: {entry_id}")
 
 
 async def tool_digest(args: dict) -> list[TextContent]:
     """Get daily digest."""
-    digest = generate_daily_digest()
-    return [TextContent(type="text", text=digest)]
+    from noodle.surfacing import generate_daily_digest
+
+    digest = generate_daily_digest(_db())
+    return _text(digest)
 
 
 async def tool_weekly(args: dict) -> list[TextContent]:
     """Get weekly review."""
-    review = generate_weekly_review()
-    return [TextContent(type="text", text=review)]
+    from noodle.surfacing import generate_weekly_review
+
+    review = generate_weekly_review(_db())
+    return _text(review)
 
 
 async def tool_pending(args: dict) -> list[TextContent]:
     """Get pending review entries."""
-    db = Database()
+    db = _db()
     entries = db.get_pending_reclassification()
 
     if not entries:
-        return [TextContent(type="text", text="No entries pending review.")]
-
-    lines = ["Entries pending manual review:", ""]
-    for entry in entries:
-        lines.append(f"  {entry['id']}  {entry['type']:8}  {entry['title'][:50]}")
+        return _text("No entries pending review.")
 
-    return [TextContent(type="text", text="\n".join(lines))]
+    body = "\n".join(
+        f"  {entry['id']}  {entry['type']:8}  {entry['title'][:50]}" for entry in entries
+    )
+    return _text(f"Entries pending manual review:\n\n{body}")
 
 
 async def tool_retype(args: dict) -> list[TextContent]:
@@ -275,42 +312,62 @@ async def tool_retype(args: dict) -> list[TextContent]:
     new_type = args.get("new_type", "").strip()
 
     if not entry_id:
-        return [TextContent(type="text", text="Error: No entry_id provided")]
-    if new_type not in ("task", "thought", "person", "event"):
-        return [TextContent(type="text", text=f"Error: Invalid type '{new_type}'")]
+        return _text("Error: No entry_id provided")
+    if new_type not in _VALID_TYPES:
+        return _text(f"Error: Invalid type '{new_type}'")
 
-    db = Database()
+    db = _db()
     success = db.update_entry_type(entry_id, new_type)
 
     if success:
-        return [TextContent(type="text", text=f"Retyped {entry_id} → {new_type}")]
+        return _text(f"Retyped {entry_id} → {new_type}")
     else:
-        return [TextContent(type="text", text=f"Entry not found: {entry_id}")]
+        return _text(f"Entry not found: {entry_id}")
 
 
 async def tool_context(args: dict) -> list[TextContent]:
     """Get context entries for a topic."""
+    from noodle.surfacing import search_entries_formatted
+
     topic = args.get("topic", "").strip()
     limit = args.get("limit", 5)
 
     if not topic:
-        return [TextContent(type="text", text="Error: No topic provided")]
+        return _text("Error: No topic provided")
 
     # Use full-text search for context
-    result = search_entries_formatted(topic, limit=limit)
+    result = search_entries_formatted(topic, _db(), limit=limit)
 
     if result.startswith("No entries"):
-        return [TextContent(type="text", text=f"No context found for '{topic}'")]
+        return _text(f"No context found for '{topic}'")
 
-    return [TextContent(type="text", text=f"Context for '{topic}':\n\n{result}")]
+    return _text(f"Context for '{topic}':\n\n{result}")
+
+
+# Tool name -> handler, for call_tool dispatch
+_TOOLS = {
+    "noodle_add": tool_add,
+    "noodle_search": tool_search,
+    "noodle_tasks": tool_tasks,
+    "noodle_complete": tool_complete,
+    "noodle_digest": tool_digest,
+    "noodle_weekly": tool_weekly,
+    "noodle_pending": tool_pending,
+    "noodle_retype": tool_retype,
+    "noodle_context": tool_context,
+}
 
 
 async def main():
     """Run the MCP server."""
+    _inbox_path()
+
     async with stdio_server() as (read_stream, write_stream):
         await server.run(read_stream, write_stream, server.create_initialization_options())
 
 
 if __name__ == "__main__":
     import asyncio
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())